@@ -1,28 +1,69 @@
+import importlib
+from typing import TYPE_CHECKING
+
 from .__about__ import __version__
-from .client import app
-from .config import OperationType, get_config
-from .main import DataFog, TextPIIAnnotator
-from .models.annotator import (
-    AnalysisExplanation,
-    AnnotationResult,
-    AnnotationResultWithAnaysisExplanation,
-    AnnotatorRequest,
-)
-from .models.anonymizer import (
-    AnonymizationResult,
-    Anonymizer,
-    AnonymizerRequest,
-    AnonymizerType,
-)
-from .models.common import AnnotatorMetadata, EntityTypes, Pattern, PatternRecognizer
-from .models.spacy_nlp import SpacyAnnotator
-from .processing.image_processing.donut_processor import DonutProcessor
-from .processing.image_processing.image_downloader import ImageDownloader
-from .processing.image_processing.pytesseract_processor import PytesseractProcessor
-from .processing.text_processing.spacy_pii_annotator import SpacyPIIAnnotator
-from .services.image_service import ImageService
-from .services.spark_service import SparkService
-from .services.text_service import TextService
+
+if TYPE_CHECKING:
+    from .client import app
+    from .config import OperationType, configure_event_loop, get_config
+    from .main import DataFog, TextPIIAnnotator
+    from .models.annotator import (
+        AnalysisExplanation,
+        AnnotationResult,
+        AnnotationResultWithAnaysisExplanation,
+        AnnotatorRequest,
+    )
+    from .models.anonymizer import (
+        AnonymizationResult,
+        Anonymizer,
+        AnonymizerRequest,
+        AnonymizerType,
+    )
+    from .models.common import (
+        AnnotatorMetadata,
+        EntityTypes,
+        Pattern,
+        PatternRecognizer,
+    )
+    from .models.spacy_nlp import SpacyAnnotator
+    from .processing.image_processing.donut_processor import DonutProcessor
+    from .processing.image_processing.image_downloader import ImageDownloader
+    from .processing.image_processing.pytesseract_processor import PytesseractProcessor
+    from .processing.text_processing.spacy_pii_annotator import SpacyPIIAnnotator
+    from .services.image_service import ImageService
+    from .services.spark_service import SparkService
+    from .services.text_service import TextService
+
+# Public names are imported on first access (PEP 562) so that `import datafog`
+# and light CLI commands don't pull in spaCy, torch or pyspark up front.
+_LAZY_IMPORTS = {
+    "app": ".client",
+    "OperationType": ".config",
+    "configure_event_loop": ".config",
+    "get_config": ".config",
+    "DataFog": ".main",
+    "TextPIIAnnotator": ".main",
+    "AnalysisExplanation": ".models.annotator",
+    "AnnotationResult": ".models.annotator",
+    "AnnotationResultWithAnaysisExplanation": ".models.annotator",
+    "AnnotatorRequest": ".models.annotator",
+    "AnonymizationResult": ".models.anonymizer",
+    "Anonymizer": ".models.anonymizer",
+    "AnonymizerRequest": ".models.anonymizer",
+    "AnonymizerType": ".models.anonymizer",
+    "AnnotatorMetadata": ".models.common",
+    "EntityTypes": ".models.common",
+    "Pattern": ".models.common",
+    "PatternRecognizer": ".models.common",
+    "SpacyAnnotator": ".models.spacy_nlp",
+    "DonutProcessor": ".processing.image_processing.donut_processor",
+    "ImageDownloader": ".processing.image_processing.image_downloader",
+    "PytesseractProcessor": ".processing.image_processing.pytesseract_processor",
+    "SpacyPIIAnnotator": ".processing.text_processing.spacy_pii_annotator",
+    "ImageService": ".services.image_service",
+    "SparkService": ".services.spark_service",
+    "TextService": ".services.text_service",
+}
 
 __all__ = [
     "DonutProcessor",
@@ -46,9 +87,23 @@ __all__ = [
     "Pattern",
     "PatternRecognizer",
     "get_config",
+    "configure_event_loop",
     "SpacyAnnotator",
     "AnonymizerType",
     "AnonymizerRequest",
     "AnonymizationResult",
     "Anonymizer",
 ]
+
+
+def __getattr__(name):
+    module_path = _LAZY_IMPORTS.get(name)
+    if module_path is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_path, __name__), name)
+    globals()[name] = value  # cache so later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(__all__) | set(globals()))
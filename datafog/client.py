@@ -15,7 +15,7 @@ from pydantic import BaseModel
 from rich import print
 from rich.progress import track
 
-from .config import get_config
+from .config import configure_event_loop, get_config
 from .main import DataFog
 from .models.anonymizer import Anonymizer, AnonymizerType, HashType
 from .models.spacy_nlp import SpacyAnnotator
@@ -47,6 +47,7 @@ def scan_image(
         raise typer.Exit(code=1)
 
     logging.basicConfig(level=logging.INFO)
+    configure_event_loop()
     ocr_client = DataFog(operations=operations)
     try:
         results = asyncio.run(ocr_client.run_ocr_pipeline(image_urls=image_urls))
@@ -80,6 +81,7 @@ def scan_text(
         raise typer.Exit(code=1)
 
     logging.basicConfig(level=logging.INFO)
+    configure_event_loop()
     text_client = DataFog(operations=operations)
     try:
         results = asyncio.run(text_client.run_text_pipeline(str_list=str_list))
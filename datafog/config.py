@@ -5,61 +5,103 @@ Defines settings and provides a global config instance.
 Includes API keys, URLs, timeouts, and other options.
 """
 
+import asyncio
 import os
+from dataclasses import dataclass, field, fields, replace
 from enum import Enum
 from typing import Optional
 
-from pydantic import HttpUrl
-from pydantic_settings import BaseSettings
+ENV_PREFIX = "DATAFOG_"
 
 
-class DataFogConfig(BaseSettings):
+def _getenv(name: str) -> Optional[str]:
+    """Look up a ``DATAFOG_`` variable, ignoring the case of its name."""
+    key = (ENV_PREFIX + name).upper()
+    value = os.environ.get(key)
+    if value is not None:
+        return value
+    for env_key, env_value in os.environ.items():
+        if env_key.upper() == key:
+            return env_value
+    return None
+
+
+def _env(name: str, default: str) -> str:
+    value = _getenv(name)
+    return value if value is not None else default
+
+
+def _env_int(name: str, default: Optional[int]) -> Optional[int]:
+    value = _getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = _getenv(name)
+    return float(value) if value not in (None, "") else default
+
+
+@dataclass(frozen=True, slots=True)
+class DataFogConfig:
     """
     Configuration settings for DataFog SDK.
 
     This class defines all the configuration options used throughout the DataFog SDK.
     It includes settings for API authentication, service URLs, timeouts, retries,
-    rate limiting, and logging. The configuration can be updated at runtime using
-    environment variables or programmatically via the update method.
+    rate limiting, and logging. Every field can be set through a ``DATAFOG_``-prefixed
+    environment variable (e.g. ``DATAFOG_API_KEY``; the name is case-insensitive),
+    read once when the instance is created.
 
-    All settings have default values that can be overridden as needed. The class
-    uses Pydantic for data validation and settings management.
+    Instances are immutable. ``update`` returns a changed copy; use ``configure``
+    to change the global configuration.
     """
 
     # API Keys and Authentication
-    api_key: str = os.environ.get("DATAFOG_API_KEY", "")
+    api_key: str = field(default_factory=lambda: _env("api_key", ""))
 
     # Base URLs for different services
-    annotator_base_url: HttpUrl = "http://localhost:8000"
-    anonymizer_base_url: HttpUrl = "http://localhost:8000"
+    annotator_base_url: str = field(
+        default_factory=lambda: _env("annotator_base_url", "http://localhost:8000")
+    )
+    anonymizer_base_url: str = field(
+        default_factory=lambda: _env("anonymizer_base_url", "http://localhost:8000")
+    )
 
     # Default language
-    default_language: str = "en"
+    default_language: str = field(
+        default_factory=lambda: _env("default_language", "en")
+    )
 
     # Timeouts
-    request_timeout: int = 30  # seconds
+    request_timeout: int = field(
+        default_factory=lambda: _env_int("request_timeout", 30)
+    )  # seconds
 
     # Retry settings
-    max_retries: int = 3
-    retry_backoff_factor: float = 0.3
+    max_retries: int = field(default_factory=lambda: _env_int("max_retries", 3))
+    retry_backoff_factor: float = field(
+        default_factory=lambda: _env_float("retry_backoff_factor", 0.3)
+    )
 
     # Rate limiting
-    rate_limit_per_minute: Optional[int] = None
+    rate_limit_per_minute: Optional[int] = field(
+        default_factory=lambda: _env_int("rate_limit_per_minute", None)
+    )
+
+    # Worker processes for spaCy's nlp.pipe on large batches (DATAFOG_NLP_PROCS).
+    # 1 keeps everything in-process; 0 or a negative value means one per CPU core.
+    nlp_procs: int = field(default_factory=lambda: _env_int("nlp_procs", 1))
 
     # Logging
-    log_level: str = "INFO"
-
-    class Config:
-        env_prefix = "DATAFOG_"
-        case_sensitive = False
-
-    def update(self, **kwargs):
-        """Update configuration with new values"""
-        for key, value in kwargs.items():
-            if hasattr(self, key):
-                setattr(self, key, value)
-            else:
+    log_level: str = field(default_factory=lambda: _env("log_level", "INFO"))
+
+    def update(self, **kwargs) -> "DataFogConfig":
+        """Return a copy of the configuration with the given values replaced."""
+        valid_keys = {f.name for f in fields(self)}
+        for key in kwargs:
+            if key not in valid_keys:
                 raise ValueError(f"Invalid configuration key: {key}")
+        return replace(self, **kwargs)
 
 
 # Create a global instance of the configuration
@@ -71,9 +113,27 @@ def get_config() -> DataFogConfig:
     return datafog_config
 
 
-def configure(**kwargs):
-    """Update the global configuration"""
-    datafog_config.update(**kwargs)
+def configure(**kwargs) -> DataFogConfig:
+    """Update the global configuration and return it"""
+    global datafog_config
+    datafog_config = datafog_config.update(**kwargs)
+    return datafog_config
+
+
+def configure_event_loop() -> bool:
+    """
+    Use uvloop for event loops created after this call, if it is installed.
+
+    uvloop's task scheduling is cheaper than the default loop's, which helps the
+    async annotation paths on documents with many small chunks. Returns True if
+    uvloop is now in use, False if it isn't installed.
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
 
 
 class OperationType(str, Enum):
@@ -9,11 +9,14 @@ These classes provide high-level interfaces for image and text processing,
 including OCR, PII detection, annotation, and anonymization.
 """
 
-import json
 import logging
+from functools import cached_property
 from typing import List
 
+from pydantic import TypeAdapter
+
 from .config import OperationType
+from .models.annotator import AnnotationResult
 from .models.anonymizer import Anonymizer, AnonymizerType, HashType
 from .processing.text_processing.spacy_pii_annotator import SpacyPIIAnnotator
 from .services.image_service import ImageService
@@ -23,6 +26,8 @@ from .services.text_service import TextService
 logger = logging.getLogger("datafog_logger")
 logger.setLevel(logging.WARNING)
 
+_ANNOTATIONS_ADAPTER = TypeAdapter(List[AnnotationResult])
+
 
 class DataFog:
     """
@@ -47,8 +52,12 @@ class DataFog:
         hash_type: HashType = HashType.SHA256,
         anonymizer_type: AnonymizerType = AnonymizerType.REPLACE,
     ):
-        self.image_service = image_service or ImageService()
-        self.text_service = text_service or TextService()
+        # Default services are built on first use (see the properties below), so
+        # e.g. an OCR-only caller never pays for loading the spaCy model.
+        if image_service is not None:
+            self.image_service = image_service
+        if text_service is not None:
+            self.text_service = text_service
         self.spark_service: SparkService = spark_service
         self.operations: List[OperationType] = operations
         self.anonymizer = Anonymizer(
@@ -58,8 +67,10 @@ class DataFog:
         self.logger.info(
             "Initializing DataFog class with the following services and operations:"
         )
-        self.logger.info(f"Image Service: {type(self.image_service)}")
-        self.logger.info(f"Text Service: {type(self.text_service)}")
+        image_service_name = type(image_service) if image_service else "default (lazy)"
+        text_service_name = type(text_service) if text_service else "default (lazy)"
+        self.logger.info(f"Image Service: {image_service_name}")
+        self.logger.info(f"Text Service: {text_service_name}")
         self.logger.info(
             f"Spark Service: {type(self.spark_service) if self.spark_service else 'None'}"
         )
@@ -67,6 +78,16 @@ class DataFog:
         self.logger.info(f"Hash Type: {hash_type}")
         self.logger.info(f"Anonymizer Type: {anonymizer_type}")
 
+    @cached_property
+    def image_service(self) -> ImageService:
+        """Image service, created on first access unless one was passed in."""
+        return ImageService()
+
+    @cached_property
+    def text_service(self) -> TextService:
+        """Text service, created on first access unless one was passed in."""
+        return TextService()
+
     async def run_ocr_pipeline(self, image_urls: List[str]):
         """
         Run the OCR pipeline asynchronously on a list of images provided via URL.
@@ -243,10 +264,11 @@ class TextPIIAnnotator:
         try:
             annotated_text = self.text_annotator.annotate(text)
 
-            # Optionally, output the results to a JSON file
+            # Optionally, output the results to a JSON file; pydantic's serializer
+            # encodes the whole list into one bytes buffer
             if output_path:
-                with open(output_path, "w") as f:
-                    json.dump(annotated_text, f)
+                with open(output_path, "wb") as f:
+                    f.write(_ANNOTATIONS_ADAPTER.dump_json(annotated_text))
 
             return annotated_text
 
@@ -5,12 +5,15 @@ Contains Pydantic models for structuring input, output, and explanations
 in the annotation process. Ensures type safety and consistent data handling.
 """
 
+from dataclasses import dataclass
 from typing import List, Optional
 
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, ConfigDict, field_validator
 
 from .common import AnnotatorMetadata, EntityTypes, PatternRecognizer
 
+_VALID_ENTITY_NAMES = frozenset(EntityTypes.__members__)
+
 
 class AnnotatorRequest(BaseModel):
     """
@@ -37,6 +40,8 @@ class AnnotationResult(BaseModel):
     Includes position, score, entity type, and optional metadata.
     """
 
+    model_config = ConfigDict(frozen=True)
+
     start: int
     end: int
     score: Optional[float]
@@ -46,9 +51,33 @@ class AnnotationResult(BaseModel):
     @field_validator("entity_type")
     @classmethod
     def validate_entity_type(cls, v):
-        if v not in EntityTypes.__members__:
-            return "UNKNOWN"
-        return v
+        return v if v in _VALID_ENTITY_NAMES else "UNKNOWN"
+
+
+@dataclass(frozen=True, slots=True)
+class EntitySpan:
+    """
+    Slotted, unvalidated record of a detected entity.
+
+    Annotation pipelines create and filter many of these; they carry no per-instance
+    ``__dict__`` and are converted to ``AnnotationResult`` only when returned.
+    """
+
+    start: int
+    end: int
+    entity_type: str
+    score: float
+    recognition_metadata: Optional[AnnotatorMetadata] = None
+
+    def to_annotation_result(self, offset: int = 0) -> AnnotationResult:
+        """Build the result, shifting the span by ``offset`` characters."""
+        return AnnotationResult.model_construct(
+            start=self.start + offset,
+            end=self.end + offset,
+            score=self.score,
+            entity_type=self.entity_type,
+            recognition_metadata=self.recognition_metadata,
+        )
 
 
 class AnalysisExplanation(BaseModel):
@@ -59,6 +88,8 @@ class AnalysisExplanation(BaseModel):
     and context improvements.
     """
 
+    model_config = ConfigDict(frozen=True)
+
     recognizer: str
     pattern_name: Optional[str]
     pattern: Optional[str]
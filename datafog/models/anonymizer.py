@@ -3,9 +3,11 @@ Data models for anonymization requests and results.
 """
 
 import hashlib
-import secrets
+import os
+import threading
 from enum import Enum
-from typing import List, Optional
+from functools import lru_cache
+from typing import Callable, List, Optional, Tuple
 
 from pydantic import BaseModel, Field
 
@@ -25,6 +27,77 @@ class HashType(str, Enum):
     SHA3_256 = "sha3_256"
 
 
+_HASH_FUNCTIONS = {
+    HashType.MD5: hashlib.md5,
+    HashType.SHA256: hashlib.sha256,
+    HashType.SHA3_256: hashlib.sha3_256,
+}
+
+
+@lru_cache(maxsize=4096)
+def _digest(hash_type: HashType, text: str) -> str:
+    """
+    Hex digest of ``text``, memoized per process.
+
+    Hashing is deterministic, so the same PII value (an email repeated across a
+    corpus, say) always maps to the same pseudonym; the cache just skips the
+    re-encode and re-hash for values that were already seen.
+    """
+    hash_function = _HASH_FUNCTIONS.get(hash_type)
+    if hash_function is None:
+        raise ValueError(f"Unsupported hash type: {hash_type}")
+    # Pseudonymization, not a security boundary: skip FIPS-mode checks in OpenSSL
+    return hash_function(text.encode(), usedforsecurity=False).hexdigest()
+
+
+def _by_position(annotation: AnnotationResult) -> Tuple[int, int]:
+    # Left to right; of spans starting together, the longer one wins the overlap
+    return (annotation.start, -annotation.end)
+
+
+def _redaction(original: str, entity_type: str) -> str:
+    return "[REDACTED]"
+
+
+_REPLACEMENT_PREFIXES = {
+    EntityTypes.PERSON: "PERSON",
+    EntityTypes.ORG: "ORG",
+    EntityTypes.GPE: "LOCATION",
+    EntityTypes.LOC: "LOCATION",
+    EntityTypes.FAC: "LOCATION",
+}
+
+_RANDOM_POOL_SIZE = 4096
+_random_pool = threading.local()
+
+
+def _reset_random_pool():
+    global _random_pool
+    _random_pool = threading.local()
+
+
+# A forked child must not replay the parent's buffered bytes
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_random_pool)
+
+
+def _random_hex8() -> str:
+    """
+    Eight upper-case hex digits of OS randomness.
+
+    Bytes are drawn from a per-thread buffer refilled with one ``os.urandom`` call,
+    rather than one syscall per replacement as ``secrets.token_hex`` does.
+    """
+    pool = _random_pool
+    buffer = getattr(pool, "buffer", b"")
+    offset = getattr(pool, "offset", 0)
+    if offset + 4 > len(buffer):
+        buffer, offset = os.urandom(_RANDOM_POOL_SIZE), 0
+        pool.buffer = buffer
+    pool.offset = offset + 4
+    return buffer[offset : offset + 4].hex().upper()
+
+
 class AnonymizerRequest(BaseModel):
     text: str
     annotator_results: List[AnnotationResult]
@@ -51,62 +124,51 @@ class Anonymizer(BaseModel):
     ) -> AnonymizationResult:
         """Anonymize PII in text based on the specified anonymizer type."""
         if self.anonymizer_type == AnonymizerType.REDACT:
-            return self.redact_pii(text, annotations)
+            make_replacement = _redaction
         elif self.anonymizer_type == AnonymizerType.REPLACE:
-            return self.replace_pii(text, annotations)
+            make_replacement = self._generate_replacement
         elif self.anonymizer_type == AnonymizerType.HASH:
-            return self.hash_pii(text, annotations)
+            make_replacement = self._hash_replacement
         else:
             raise ValueError(f"Unsupported anonymizer type: {self.anonymizer_type}")
+        return self._rewrite(
+            text, sorted(annotations, key=_by_position), make_replacement
+        )
 
     def replace_pii(
         self, text: str, annotations: List[AnnotationResult]
     ) -> AnonymizationResult:
         """Replace PII in text with anonymized values."""
-        replacements = []
-        for annotation in sorted(annotations, key=lambda x: x.start, reverse=True):
-            if not self.entities or annotation.entity_type in self.entities:
-                replacement = self._generate_replacement(
-                    text[annotation.start : annotation.end], annotation.entity_type
-                )
-                replacements.append(
-                    {
-                        "original": text[annotation.start : annotation.end],
-                        "replacement": replacement,
-                        "entity_type": annotation.entity_type,
-                    }
-                )
-                text = text[: annotation.start] + replacement + text[annotation.end :]
-
-        return AnonymizationResult(anonymized_text=text, replaced_entities=replacements)
-
-    def _generate_replacement(self, original: str, entity_type: str) -> str:
-        """Generate a replacement for the given entity based on spaCy's entity types."""
-        if entity_type == "PERSON":
-            return f"[PERSON_{secrets.token_hex(4).upper()}]"
-        elif entity_type == "ORG":
-            return f"[ORG_{secrets.token_hex(4).upper()}]"
-        elif entity_type in {"GPE", "LOC", "FAC"}:
-            return f"[LOCATION_{secrets.token_hex(4).upper()}]"
-        elif entity_type == "DATE":
-            return "[REDACTED_DATE]"
-        else:
-            return f"[{entity_type}_{secrets.token_hex(4).upper()}]"
-
-    def hash_pii(
-        self, text: str, annotations: List[AnnotationResult]
+        return self._rewrite(
+            text, sorted(annotations, key=_by_position), self._generate_replacement
+        )
+
+    def _rewrite(
+        self,
+        text: str,
+        annotations: List[AnnotationResult],
+        make_replacement: Callable[[str, str], str],
     ) -> AnonymizationResult:
-        """Hash PII in text."""
+        """
+        Swap every selected entity for ``make_replacement(original, entity_type)``.
+
+        ``annotations`` must already be sorted by ``start``.
+        """
+        # Build the output in one forward pass instead of re-slicing the text per entity
+        parts = []
         replacements = []
-        for annotation in sorted(annotations, key=lambda x: x.start, reverse=True):
+        cursor = 0
+        for annotation in annotations:
             if self.entities and annotation.entity_type not in self.entities:
                 continue
-
-            start, end = annotation.start, annotation.end
-            original = text[start:end]
-            replacement = self._hash_text(original)
-
-            text = text[:start] + replacement + text[end:]
+            if annotation.start < cursor:
+                continue  # overlaps an entity that was already replaced
+
+            original = text[annotation.start : annotation.end]
+            replacement = make_replacement(original, annotation.entity_type)
+            parts.append(text[cursor : annotation.start])
+            parts.append(replacement)
+            cursor = annotation.end
             replacements.append(
                 {
                     "original": original,
@@ -114,38 +176,35 @@ class Anonymizer(BaseModel):
                     "entity_type": annotation.entity_type,
                 }
             )
+        parts.append(text[cursor:])
+        replacements.reverse()  # keep the previous end-to-start ordering
 
-        return AnonymizationResult(anonymized_text=text, replaced_entities=replacements)
+        return AnonymizationResult(
+            anonymized_text="".join(parts), replaced_entities=replacements
+        )
 
-    def _hash_text(self, text: str) -> str:
-        if self.hash_type == HashType.MD5:
-            return hashlib.md5(text.encode()).hexdigest()
-        elif self.hash_type == HashType.SHA256:
-            return hashlib.sha256(text.encode()).hexdigest()
-        elif self.hash_type == HashType.SHA3_256:
-            return hashlib.sha3_256(text.encode()).hexdigest()
-        else:
-            raise ValueError(f"Unsupported hash type: {self.hash_type}")
+    def _generate_replacement(self, original: str, entity_type: str) -> str:
+        """Generate a replacement for the given entity based on spaCy's entity types."""
+        if entity_type == EntityTypes.DATE:
+            return "[REDACTED_DATE]"
+        prefix = _REPLACEMENT_PREFIXES.get(entity_type, entity_type)
+        return f"[{prefix}_{_random_hex8()}]"
 
-    def redact_pii(
+    def hash_pii(
         self, text: str, annotations: List[AnnotationResult]
     ) -> AnonymizationResult:
-        replacements = []
-        for annotation in sorted(annotations, key=lambda x: x.start, reverse=True):
-            if self.entities and annotation.entity_type not in self.entities:
-                continue
+        """Hash PII in text."""
+        return self._rewrite(
+            text, sorted(annotations, key=_by_position), self._hash_replacement
+        )
 
-            start, end = annotation.start, annotation.end
-            original = text[start:end]
-            replacement = "[REDACTED]"
+    def _hash_replacement(self, original: str, entity_type: str) -> str:
+        return self._hash_text(original)
 
-            text = text[:start] + replacement + text[end:]
-            replacements.append(
-                {
-                    "original": original,
-                    "replacement": replacement,
-                    "entity_type": annotation.entity_type,
-                }
-            )
+    def _hash_text(self, text: str) -> str:
+        return _digest(self.hash_type, text)
 
-        return AnonymizationResult(anonymized_text=text, replaced_entities=replacements)
+    def redact_pii(
+        self, text: str, annotations: List[AnnotationResult]
+    ) -> AnonymizationResult:
+        return self._rewrite(text, sorted(annotations, key=_by_position), _redaction)
@@ -7,7 +7,7 @@ Defines entity types, patterns, and metadata structures used across the library.
 from enum import Enum
 from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 from enum import Enum
 
@@ -34,12 +34,15 @@ class EntityTypes(str, Enum):
     CARDINAL = "CARDINAL"
     EMAIL = "EMAIL"
     PHONE_NUMBER = "PHONE_NUMBER"
+    CREDIT_CARD = "CREDIT_CARD"
 
 
 
 class Pattern(BaseModel):
     """Regex pattern for entity recognition."""
 
+    model_config = ConfigDict(frozen=True)
+
     name: str
     regex: str
     score: float
@@ -48,6 +51,8 @@ class Pattern(BaseModel):
 class PatternRecognizer(BaseModel):
     """Configuration for a pattern-based entity recognizer."""
 
+    model_config = ConfigDict(frozen=True)
+
     name: str
     supported_language: str
     patterns: List[Pattern]
@@ -59,4 +64,6 @@ class PatternRecognizer(BaseModel):
 class AnnotatorMetadata(BaseModel):
     """Metadata for annotation results."""
 
+    model_config = ConfigDict(frozen=True)
+
     recognizer_name: Optional[str] = None
@@ -8,10 +8,11 @@ text annotation, entity recognition, and related NLP tasks.
 from typing import List, Optional
 from uuid import uuid4
 
-import spacy
-from rich.progress import track
-
-from .annotator import AnnotationResult, AnnotatorRequest
+from ..processing.text_processing.spacy_pii_annotator import (
+    DEFAULT_SPACY_MODEL,
+    _load_nlp,
+)
+from .annotator import _VALID_ENTITY_NAMES, AnnotationResult, AnnotatorRequest
 
 
 class SpacyAnnotator:
@@ -22,14 +23,17 @@ class SpacyAnnotator:
     Supports various NLP tasks including entity recognition and model management.
     """
 
-    def __init__(self, model_name: str = "en_core_web_lg"):
+    def __init__(self, model_name: str = DEFAULT_SPACY_MODEL):
         self.model_name = model_name
         self.nlp = None
 
     def load_model(self):
+        # spaCy is imported on first use so the CLI starts quickly
+        import spacy
+
         if not spacy.util.is_package(self.model_name):
             spacy.cli.download(self.model_name)
-        self.nlp = spacy.load(self.model_name)
+        self.nlp = _load_nlp(self.model_name)
 
     def annotate_text(self, text: str, language: str = "en") -> List[AnnotationResult]:
         if not self.nlp:
@@ -47,12 +51,13 @@ class SpacyAnnotator:
         )
         doc = self.nlp(annotator_request.text)
         results = []
-        for ent in track(doc.ents, description="Processing entities"):
-            result = AnnotationResult(
+        for ent in doc.ents:
+            label = ent.label_
+            result = AnnotationResult.model_construct(
                 start=ent.start_char,
                 end=ent.end_char,
                 score=0.8,  # Placeholder score
-                entity_type=ent.label_,
+                entity_type=label if label in _VALID_ENTITY_NAMES else "UNKNOWN",
                 recognition_metadata=None,
             )
             results.append(result)
@@ -65,13 +70,17 @@ class SpacyAnnotator:
 
     @staticmethod
     def download_model(model_name: str):
+        import spacy.cli
+
         spacy.cli.download(model_name)
 
     @staticmethod
     def list_models() -> List[str]:
+        import spacy
+
         return spacy.util.get_installed_models()
 
     @staticmethod
     def list_entities() -> List[str]:
-        nlp = spacy.load("en_core_web_lg")
+        nlp = _load_nlp(DEFAULT_SPACY_MODEL)
         return [ent for ent in nlp.pipe_labels["ner"]]
@@ -1,8 +1,16 @@
 import logging
-from typing import Any, Dict, List
+import re
+import threading
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from functools import lru_cache
+from operator import attrgetter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
-from pydantic import BaseModel
-from datafog.models.annotator import AnnotationResult
+from pydantic import BaseModel, ConfigDict, PrivateAttr
+from datafog.models.annotator import _VALID_ENTITY_NAMES, AnnotationResult, EntitySpan
+from datafog.models.common import AnnotatorMetadata
+from datafog.processing.validators import luhn_ok
 
 PII_ANNOTATION_LABELS = [
     "CARDINAL",
@@ -25,47 +33,236 @@ PII_ANNOTATION_LABELS = [
     "WORK_OF_ART",
 ]
 MAXIMAL_STRING_SIZE = 1000000
+DEFAULT_SPACY_MODEL = "en_core_web_sm"
+SPACY_MODEL_VERSION = "3.7.1"
+# Only tok2vec + ner feed ``doc.ents``; the rest would run on every call for nothing.
+DISABLED_PIPES = ["tagger", "parser", "lemmatizer", "attribute_ruler"]
+
+# Pattern-based entities are cheaper to find with a regex than with the NER model.
+# Listed in priority order: a later pattern never claims text an earlier one matched.
+EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+# Card numbers as printed: 4-4-4-4 or 4-6-5 groups with one separator throughout,
+# or 13-19 digits without separators. The 19-digit 4-4-4-4-3 grouping is tried
+# first, on its own, so a 16-digit card followed by a CVV still matches after it.
+CREDIT_CARD_19_RE = re.compile(r"(?<!\d)\d{4}([ -])\d{4}\1\d{4}\1\d{4}\1\d{3}(?!\d)")
+CREDIT_CARD_RE = re.compile(
+    r"(?<!\d)(?:\d{4}([ -])\d{4}\1\d{4}\1\d{4}|\d{4}([ -])\d{6}\2\d{5}|\d{13,19})"
+    r"(?!\d)"
+)
+# A country code needs a leading + or a separator after it, so a bare run of
+# 11-13 digits (an account or reference number) is not a phone number.
+PHONE_RE = re.compile(
+    r"(?<![\w+])(?:\+\d{1,3}[-. ]?|\d{1,3}[-. ])?"
+    r"(?:\(\d{3}\)|\d{3})[-. ]?\d{3}[-. ]?\d{4}(?!\d)"
+)
+# (entity type, pattern, optional validator a match must also pass)
+REGEX_PATTERNS = [
+    ("EMAIL", EMAIL_RE, None),
+    ("CREDIT_CARD", CREDIT_CARD_19_RE, luhn_ok),
+    ("CREDIT_CARD", CREDIT_CARD_RE, luhn_ok),
+    ("PHONE_NUMBER", PHONE_RE, None),
+]
+# Frozen, so one instance can be shared by every regex match
+REGEX_METADATA = AnnotatorMetadata(recognizer_name="regex")
+
+# Names, places, organizations and numeric amounts almost always carry a capital
+# letter, a digit or a non-ASCII letter, so with ner_prefilter=True texts without
+# any skip NER and only get the regexes. This trades recall for speed: the model
+# also labels lowercase words such as "tomorrow", "noon", "three" or "first"
+# (DATE, TIME, CARDINAL, ORDINAL), which are lost in such texts. Off by default,
+# since ordinary prose almost always matches and only all-lowercase input (chat
+# logs, transcripts) is skipped.
+NER_HINT_RE = re.compile(r"[^\W_a-z]")
+
+# Chunks remembered per annotator; templated documents repeat headers and footers
+RESULT_CACHE_SIZE = 1024
+# Longest text worth caching: a TextService chunk (by default 1000 characters plus
+# the 50-character overlap on each side, 1100 in all) with some headroom. Whole
+# documents rarely repeat and would let the cache grow to ~1GB. Raise this along
+# with TextService's text_chunk_length or chunk_overlap defaults.
+RESULT_CACHE_MAX_TEXT_LENGTH = 2048
+
+# Annotators handed out by SpacyPIIAnnotator.create(), keyed by
+# (class, model name, disabled pipes)
+_ANNOTATORS: Dict[tuple, "SpacyPIIAnnotator"] = {}
+_ANNOTATORS_LOCK = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def _load_nlp(
+    model_name: str = DEFAULT_SPACY_MODEL,
+    disable: Tuple[str, ...] = tuple(DISABLED_PIPES),
+):
+    """
+    Load a spaCy pipeline once per process, model name and set of disabled pipes.
+
+    The returned ``Language`` object is shared by every annotator created for
+    the same model, so callers must treat it as read-only: adding, removing or
+    reconfiguring pipes at runtime affects all of them.
+    """
+    import spacy
+
+    try:
+        nlp = spacy.load(model_name, disable=list(disable))
+    except OSError:
+        import subprocess
+        import sys
+
+        interpreter_location = sys.executable
+        subprocess.run(
+            [
+                interpreter_location,
+                "-m",
+                "pip",
+                "install",
+                "--no-deps",
+                "--no-cache-dir",
+                f"https://github.com/explosion/spacy-models/releases/download/{model_name}-{SPACY_MODEL_VERSION}/{model_name}-{SPACY_MODEL_VERSION}-py3-none-any.whl",
+            ],
+            check=True,
+        )
+        nlp = spacy.load(model_name, disable=list(disable))
+    return nlp
+
+
+def _overlaps(start: int, end: int, starts: List[int], ends: List[int]) -> bool:
+    """Whether ``[start, end)`` overlaps a span of the sorted ``starts``/``ends``.
+
+    The spans are disjoint, so the only candidate is the last one starting before
+    ``end``.
+    """
+    i = bisect_left(starts, end) - 1
+    return i >= 0 and ends[i] > start
+
+
+def _doc_to_spans(doc) -> List[EntitySpan]:
+    return _find_spans(doc.text, doc.ents)
+
+
+def _find_spans(text: str, ents=()) -> List[EntitySpan]:
+    """
+    Regex matches in ``text`` and ``ents`` minus any overlapping a match, in
+    document order.
+    """
+    spans = []
+    starts, ends = [], []  # kept regex matches, sorted for _overlaps
+    for entity_type, pattern, validator in REGEX_PATTERNS:
+        match = pattern.search(text)
+        while match is not None:
+            start, end = match.span()
+            if _overlaps(start, end, starts, ends):
+                match = pattern.search(text, end)
+                continue
+            if validator is not None and not validator(match.group()):
+                # A rejected candidate may hide a valid one starting inside it,
+                # e.g. a card number after a stray digit group
+                match = pattern.search(text, start + 1)
+                continue
+            match = pattern.search(text, end)
+            spans.append(EntitySpan(start, end, entity_type, 1.0, REGEX_METADATA))
+            i = bisect_left(starts, start)
+            starts.insert(i, start)
+            ends.insert(i, end)
+    for ent in ents:
+        # Regex matches win over e.g. a CARDINAL the model found in the same digits
+        if _overlaps(ent.start_char, ent.end_char, starts, ends):
+            continue
+        # spaCy output is trusted, so skip validation and sanitize the label inline
+        label = ent.label_
+        spans.append(
+            EntitySpan(
+                ent.start_char,
+                ent.end_char,
+                label if label in _VALID_ENTITY_NAMES else "UNKNOWN",
+                0.8,  # Adjust the score as needed
+            )
+        )
+    # Collected recognizer by recognizer; callers expect text order like doc.ents
+    spans.sort(key=attrgetter("start"))
+    return spans
+
+
+class _SpanCache:
+    """
+    Thread-safe LRU map from a (truncated) input text to the spans found in it.
+
+    Keys are the texts themselves rather than a digest of them, so a hash
+    collision can never hand back another text's entities. Texts longer than
+    ``max_text_length`` are not stored, which bounds the memory held.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = RESULT_CACHE_SIZE,
+        max_text_length: int = RESULT_CACHE_MAX_TEXT_LENGTH,
+    ):
+        self.maxsize = maxsize
+        self.max_text_length = max_text_length
+        self._entries: "OrderedDict[str, Tuple[EntitySpan, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, text: str) -> Optional[Tuple[EntitySpan, ...]]:
+        with self._lock:
+            spans = self._entries.get(text)
+            if spans is not None:
+                self._entries.move_to_end(text)
+            return spans
+
+    def put(self, text: str, spans: Tuple[EntitySpan, ...]) -> None:
+        if not self.maxsize or len(text) > self.max_text_length:
+            return
+        with self._lock:
+            self._entries[text] = spans
+            self._entries.move_to_end(text)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
 
 
 class SpacyPIIAnnotator(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     nlp: Any
+    # Skip NER for texts without a NER_HINT_RE match; see there for the trade-off
+    ner_prefilter: bool = False
+    _cache: _SpanCache = PrivateAttr(default_factory=_SpanCache)
 
     @classmethod
-    def create(cls) -> "SpacyPIIAnnotator":
-        import spacy
+    def create(
+        cls,
+        model_name: str = DEFAULT_SPACY_MODEL,
+        required_pipes: Iterable[str] = (),
+        ner_prefilter: bool = False,
+    ) -> "SpacyPIIAnnotator":
+        """
+        Return the process-wide annotator for ``model_name``, loading it on first use.
 
-        try:
-            nlp = spacy.load("en_core_web_lg")
-        except OSError:
-            import subprocess
-            import sys
-
-            interpreter_location = sys.executable
-            subprocess.run(
-                [
-                    interpreter_location,
-                    "-m",
-                    "pip",
-                    "install",
-                    "--no-deps",
-                    "--no-cache-dir",
-                    "https://github.com/explosion/spacy-models/releases/download/en_core_web_lg-3.7.1/en_core_web_lg-3.7.1-py3-none-any.whl",
-                ],
-                check=True,
-            )
-            nlp = spacy.load("en_core_web_lg")
-        # Add custom patterns
-        ruler = nlp.add_pipe("entity_ruler", after="ner")
-        ruler.matcher.validate = True  # Enable validation
-        patterns = [
-            {"label": "EMAIL", "pattern": [{"LIKE_EMAIL": True}]},
-            {"label": "PHONE_NUMBER",
-             "pattern": [{"ORTH": "+", "OP": "?"}, {"SHAPE": "ddd"}, {"ORTH": "-", "OP": "?"}, {"SHAPE": "ddd"},
-                         {"ORTH": "-", "OP": "?"}, {"SHAPE"
-                                                    "dddd"}]},
-        ]
-        ruler.add_patterns(patterns)
-        return cls(nlp=nlp)
+        Pipes in ``DISABLED_PIPES`` are not run unless listed in ``required_pipes``;
+        each distinct set loads its own pipeline rather than toggling a shared one.
+
+        ``ner_prefilter=True`` skips NER on texts with no ``NER_HINT_RE`` match,
+        losing lowercase dates and numbers in them.
+
+        The instance is shared by every caller and thread; spaCy pipelines are safe
+        for concurrent read-only use, so it must not be mutated.
+        """
+        required = set(required_pipes)
+        disable = tuple(pipe for pipe in DISABLED_PIPES if pipe not in required)
+        key = (cls, model_name, disable, ner_prefilter)
+        annotator = _ANNOTATORS.get(key)
+        if annotator is None:
+            # Double-checked so concurrent first calls load the model only once
+            with _ANNOTATORS_LOCK:
+                annotator = _ANNOTATORS.get(key)
+                if annotator is None:
+                    annotator = cls(
+                        nlp=_load_nlp(model_name, disable), ner_prefilter=ner_prefilter
+                    )
+                    _ANNOTATORS[key] = annotator
+        return annotator
 
     # def annotate(self, text: str) -> Dict[str, List[str]]:
     #     try:
@@ -85,27 +282,109 @@ class SpacyPIIAnnotator(BaseModel):
     #             label: [] for label in PII_ANNOTATION_LABELS
     #         }  # Return empty annotations in case of error
 
+    def clear_cache(self) -> None:
+        """Forget the spans remembered for previously annotated texts."""
+        self._cache.clear()
+
+    def _needs_ner(self, text: str) -> bool:
+        return not self.ner_prefilter or NER_HINT_RE.search(text) is not None
+
     def annotate(self, text: str) -> List[AnnotationResult]:
+        """
+        Entities found in ``text`` by the regexes and the spaCy model.
+
+        With ``ner_prefilter`` on, texts without a capital letter, digit or
+        non-ASCII letter skip the model, so lowercase DATE/TIME/CARDINAL/ORDINAL
+        words such as "tomorrow" are not reported in them.
+        """
+        return [span.to_annotation_result() for span in self.annotate_spans(text)]
+
+    def annotate_batch(
+        self, texts: Iterable[str], batch_size: int = 64, n_process: int = 1
+    ) -> List[List[AnnotationResult]]:
+        """Annotate many texts with one ``nlp.pipe`` pass; see ``iter_spans_batch``."""
+        return [
+            [span.to_annotation_result() for span in spans]
+            for spans in self.annotate_spans_batch(texts, batch_size, n_process)
+        ]
+
+    def annotate_spans(self, text: str) -> Tuple[EntitySpan, ...]:
+        """Like ``annotate``, but returns the slotted spans without building results."""
         try:
             if not text:
-                return []
+                return ()
             if len(text) > MAXIMAL_STRING_SIZE:
                 text = text[:MAXIMAL_STRING_SIZE]
-            doc = self.nlp(text)
-            results = []
-            for ent in doc.ents:
-                result = AnnotationResult(
-                    start=ent.start_char,
-                    end=ent.end_char,
-                    score=0.8,  # Adjust the score as needed
-                    entity_type=ent.label_,
-                    recognition_metadata=None,
-                )
-                results.append(result)
-            return results
+            spans = self._cache.get(text)
+            if spans is None:
+                if self._needs_ner(text):
+                    spans = tuple(_doc_to_spans(self.nlp(text)))
+                    self._cache.put(text, spans)
+                else:
+                    spans = tuple(_find_spans(text))
+            return spans
         except Exception as e:
             logging.error(f"Error processing text for PII annotations: {str(e)}")
-            return []  # Return empty list in case of error
+            return ()  # Return no spans in case of error
+
+    def annotate_spans_batch(
+        self, texts: Iterable[str], batch_size: int = 64, n_process: int = 1
+    ) -> List[Tuple[EntitySpan, ...]]:
+        """List form of ``iter_spans_batch``, with one entry per input text."""
+        return list(self.iter_spans_batch(texts, batch_size, n_process))
 
-        class Config:
-            arbitrary_types_allowed = True
+    def iter_spans_batch(
+        self, texts: Iterable[str], batch_size: int = 64, n_process: int = 1
+    ) -> Iterator[Tuple[EntitySpan, ...]]:
+        """
+        Lazily yield the entity spans of each text, in input order, from one
+        ``nlp.pipe`` pass.
+
+        ``texts`` may be a lazy iterable; it is consumed once, so only about
+        ``batch_size`` texts need to be held in memory at a time. Texts already in
+        the result cache, or with nothing for NER to find, skip the pipeline. On a
+        pipeline error the error is logged and the texts not yet yielded are
+        annotated one at a time with ``annotate_spans``, so only the text that
+        fails loses its spans.
+        """
+        slots = deque()  # one-item lists, in input order; None until annotated
+        misses = deque()  # (slot, text) of cache misses in pipeline order
+
+        def uncached():
+            for text in texts:
+                text = text[:MAXIMAL_STRING_SIZE] if text else ""
+                spans = self._cache.get(text)
+                if spans is None and not self._needs_ner(text):
+                    spans = tuple(_find_spans(text))
+                slot = [spans]
+                slots.append(slot)
+                if spans is None:
+                    misses.append((slot, text))
+                    yield text
+
+        source = uncached()
+        try:
+            docs = self.nlp.pipe(source, batch_size=batch_size, n_process=n_process)
+            for doc in docs:
+                slot, text = misses[0]
+                slot[0] = spans = tuple(_doc_to_spans(doc))
+                misses.popleft()
+                self._cache.put(text, spans)
+                while slots and slots[0][0] is not None:
+                    yield slots.popleft()[0]
+        except Exception as e:
+            logging.error(f"Error processing texts for PII annotations: {str(e)}")
+            try:
+                while True:
+                    while misses:
+                        slot, text = misses.popleft()
+                        slot[0] = self.annotate_spans(text)
+                    while slots and slots[0][0] is not None:
+                        yield slots.popleft()[0]
+                    # pulls the next text, queuing it in misses if it needs NER
+                    if next(source, None) is None:
+                        break
+            except Exception as e:
+                logging.error(f"Error reading texts for PII annotations: {str(e)}")
+        while slots and slots[0][0] is not None:  # cache hits after the last miss
+            yield slots.popleft()[0]
@@ -0,0 +1,22 @@
+"""
+Checksum validators for pattern-based PII candidates.
+
+Regexes over digit runs overmatch, so candidates such as credit card numbers are
+confirmed with a checksum before they are reported.
+"""
+
+
+def luhn_ok(number: str) -> bool:
+    """Return True if the digits in ``number`` pass the Luhn checksum."""
+    digits = "".join(char for char in number if char.isdigit())
+    if not digits:
+        return False
+    total = 0
+    for index, char in enumerate(reversed(digits)):
+        digit = ord(char) - 48
+        if index % 2:
+            digit *= 2
+            if digit > 9:
+                digit -= 9
+        total += digit
+    return total % 10 == 0
@@ -11,7 +11,7 @@ import io
 import logging
 import os
 import ssl
-from typing import List
+from typing import List, Optional
 
 import aiohttp
 import certifi
@@ -22,23 +22,35 @@ from datafog.processing.image_processing.pytesseract_processor import (
     PytesseractProcessor,
 )
 
+# Upper bound on simultaneous image downloads per ImageService call.
+MAX_CONCURRENT_DOWNLOADS = 16
+
+
+def _create_session() -> aiohttp.ClientSession:
+    ssl_context = ssl.create_default_context(cafile=certifi.where())
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(ssl=ssl_context, limit=MAX_CONCURRENT_DOWNLOADS)
+    )
+
 
 class ImageDownloader:
     """Asynchronous image downloader with SSL support."""
 
-    async def download_image(self, url: str) -> Image.Image:
-        ssl_context = ssl.create_default_context(cafile=certifi.where())
-        async with aiohttp.ClientSession(
-            connector=aiohttp.TCPConnector(ssl=ssl_context)
-        ) as session:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    image_data = await response.read()
-                    return Image.open(io.BytesIO(image_data))
-                else:
-                    raise Exception(
-                        f"Failed to download image. Status code: {response.status}"
-                    )
+    async def download_image(
+        self, url: str, session: Optional[aiohttp.ClientSession] = None
+    ) -> Image.Image:
+        """Download one image, reusing ``session`` (and its connections) if given."""
+        if session is None:
+            async with _create_session() as session:
+                return await self.download_image(url, session)
+        async with session.get(url) as response:
+            if response.status == 200:
+                image_data = await response.read()
+                return Image.open(io.BytesIO(image_data))
+            else:
+                raise Exception(
+                    f"Failed to download image. Status code: {response.status}"
+                )
 
 
 class ImageService:
@@ -69,38 +81,56 @@ class ImageService:
         )
 
     async def download_images(self, urls: List[str]) -> List[Image.Image]:
-        tasks = [
-            asyncio.create_task(self.downloader.download_image(url)) for url in urls
-        ]
-        return await asyncio.gather(*tasks, return_exceptions=True)
+        async with _create_session() as session:
+            tasks = [
+                asyncio.create_task(self.downloader.download_image(url, session))
+                for url in urls
+            ]
+            return await asyncio.gather(*tasks, return_exceptions=True)
 
     async def ocr_extract(self, image_paths: List[str]) -> List[str]:
-        results = []
-        for path in image_paths:
-            try:
-                if os.path.isfile(path):
-                    # Local file
-                    with Image.open(path) as img:
-                        img.verify()  # Verify the image
-                    image = Image.open(path)
-                else:
-                    # URL
-                    image = await self.downloader.download_image(path)
-
-                if self.use_tesseract:
-                    text = await self.tesseract_processor.extract_text_from_image(image)
-                elif self.use_donut:
-                    text = await self.donut_processor.extract_text_from_image(image)
-                else:
-                    raise ValueError("No OCR processor selected")
-
-                results.append(text)
-            except Exception as e:
-                error_msg = f"Error processing image {path}: {str(e)}"
-                logging.error(error_msg)
-                results.append(error_msg)
+        # One session and connection pool for the whole call, so downloads overlap
+        # instead of paying a fresh connection + TLS handshake per image.
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+        async with _create_session() as session:
+            return await asyncio.gather(
+                *[
+                    self._ocr_extract_one(path, session, semaphore)
+                    for path in image_paths
+                ]
+            )
 
-        return results
+    async def _ocr_extract_one(
+        self, path: str, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore
+    ) -> str:
+        try:
+            if os.path.isfile(path):
+                # Local file; read off the event loop so downloads keep flowing
+                loop = asyncio.get_running_loop()
+                image = await loop.run_in_executor(None, self._open_local_image, path)
+            else:
+                # URL
+                async with semaphore:
+                    image = await self.downloader.download_image(path, session)
+
+            if self.use_tesseract:
+                return await self.tesseract_processor.extract_text_from_image(image)
+            elif self.use_donut:
+                return await self.donut_processor.extract_text_from_image(image)
+            else:
+                raise ValueError("No OCR processor selected")
+        except Exception as e:
+            error_msg = f"Error processing image {path}: {str(e)}"
+            logging.error(error_msg)
+            return error_msg
+
+    @staticmethod
+    def _open_local_image(path: str) -> Image.Image:
+        with Image.open(path) as img:
+            img.verify()  # Verify the image
+        image = Image.open(path)
+        image.load()
+        return image
 
     async def process_images(self, image_urls, operation):
         results = []
@@ -5,66 +5,266 @@ Provides synchronous and asynchronous methods for annotating text with personall
 """
 
 import asyncio
-from typing import Dict, List
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from itertools import chain, islice
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
 
+from datafog.config import get_config
 from datafog.processing.text_processing.spacy_pii_annotator import SpacyPIIAnnotator
-from datafog.models.annotator import AnnotationResult
+from datafog.models.annotator import AnnotationResult, EntitySpan
+
+# Below this many chunks, forking spaCy workers costs more than it saves.
+MULTIPROCESS_MIN_CHUNKS = 100
+CHUNKS_PER_PROCESS = 16
+
+SENTENCE_BREAK_RE = re.compile(r"(?<=[.!?])\s+")
+
+# Thread pool shared by every TextService's async methods, created on first use
+_POOL: Optional[ThreadPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
+
+
+def _reset_pool():
+    global _POOL
+    _POOL = None
+
+
+# A forked child inherits the pool but not its worker threads
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_pool)
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    """Return the process-wide annotation thread pool, starting it if needed."""
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                # spaCy releases the GIL in its Cython kernels, so more threads
+                # than cores only adds contention; threads start lazily.
+                _POOL = ThreadPoolExecutor(max_workers=os.cpu_count())
+    return _POOL
+
+
+class ChunkingStrategy(str, Enum):
+    FIXED = "fixed"  # every text_chunk_length characters
+    SENTENCE = "sentence"  # whole sentences packed up to text_chunk_length characters
+
 
 class TextService:
     """
     Manages text annotation operations.
 
     Handles text chunking, PII annotation, and result combination for both single texts and batches. Offers both synchronous and asynchronous interfaces.
+
+    The async methods benefit from uvloop when it is installed; see
+    ``datafog.config.configure_event_loop``.
+
+    With ``ner_prefilter=True``, chunks without a capital letter, digit or
+    non-ASCII letter skip the spaCy model and only get the regex recognizers,
+    which loses lowercase DATE/TIME/CARDINAL/ORDINAL words such as "tomorrow".
     """
 
-    def __init__(self, text_chunk_length: int = 1000):
-        self.annotator = SpacyPIIAnnotator.create()
+    def __init__(
+        self,
+        text_chunk_length: int = 1000,
+        batch_size: int = 64,
+        n_process: Optional[int] = None,
+        chunk_overlap: int = 50,
+        chunking: ChunkingStrategy = ChunkingStrategy.FIXED,
+        required_pipes: Iterable[str] = (),
+        ner_prefilter: bool = False,
+    ):
+        # Only tok2vec + ner run by default; list e.g. "parser" here to keep it
+        self.annotator = SpacyPIIAnnotator.create(
+            required_pipes=required_pipes, ner_prefilter=ner_prefilter
+        )
         self.text_chunk_length = text_chunk_length
+        self.chunking = ChunkingStrategy(chunking)
+        # Each chunk also reads this many characters on either side, so entities
+        # straddling a chunk border are still seen whole by the chunk owning them.
+        self.chunk_overlap = chunk_overlap
+        self.batch_size = batch_size
+        # Upper bound on spaCy worker processes; None defers to config.nlp_procs.
+        self.n_process = n_process
 
-    def _chunk_text(self, text: str) -> List[str]:
-        """Split the text into chunks of specified length."""
-        return [
-            text[i : i + self.text_chunk_length]
-            for i in range(0, len(text), self.text_chunk_length)
-        ]
+    def _chunk_offsets(self, text_length: int) -> range:
+        """Start offsets of the chunks covering ``text_length`` characters."""
+        if not text_length:
+            return range(0)
+        # Stop early once the previous chunk's overlap already reaches the end.
+        stop = max(text_length - self.chunk_overlap, 1)
+        return range(0, stop, self.text_chunk_length)
+
+    def _sentence_offsets(self, text: str) -> List[int]:
+        """
+        Start offsets of chunks made by greedily packing whole sentences.
+
+        A sentence longer than ``text_chunk_length`` is split by character count.
+        """
+        if not text:
+            return []
+        limit = self.text_chunk_length
+        starts = [0]
+        chunk_start = last_break = 0
+        breaks = (match.end() for match in SENTENCE_BREAK_RE.finditer(text))
+        for boundary in chain(breaks, (len(text),)):
+            while boundary - chunk_start > limit:
+                # Close the chunk at the last sentence that fits, or cut mid-sentence
+                if last_break > chunk_start:
+                    chunk_start = last_break
+                else:
+                    chunk_start += limit
+                starts.append(chunk_start)
+            last_break = boundary
+        return starts
 
-    def _combine_annotations(self, annotations_list: List[List[AnnotationResult]]) -> List[AnnotationResult]:
-        """Combine lists of AnnotationResult from multiple chunks."""
-        combined_annotations = []
-        for annotation in annotations_list:
-            combined_annotations.extend(annotation)
-        return combined_annotations
+    def _chunk_starts(self, text: str) -> Sequence[int]:
+        """Start offsets of the chunks of ``text`` for the configured strategy."""
+        if self.chunking is ChunkingStrategy.SENTENCE:
+            return self._sentence_offsets(text)
+        return self._chunk_offsets(len(text))
+
+    def _chunk_text(self, text: str) -> List[Tuple[int, str]]:
+        """Split the text into overlapping chunks, each paired with its start offset."""
+        starts = self._chunk_starts(text)
+        return list(zip(starts, self._iter_chunks(text, starts)))
+
+    def _iter_chunks(self, text: str, starts: Sequence[int]) -> Iterator[str]:
+        """
+        Lazily yield the chunk at each of ``starts`` so each slice is created only
+        when consumed. A chunk reads ``chunk_overlap`` characters of context on
+        either side: from ``_chunk_origin(start)`` to the next start plus the
+        overlap.
+        """
+        overlap = self.chunk_overlap
+        if isinstance(starts, range):
+            # Fixed stride: every chunk has the same length, so skip the look-ahead
+            length = starts.step + overlap
+            for start in starts:
+                yield text[self._chunk_origin(start) : start + length]
+            return
+        for start, next_start in zip(starts, chain(starts[1:], (len(text),))):
+            yield text[self._chunk_origin(start) : next_start + overlap]
+
+    def _chunk_origin(self, start: int) -> int:
+        """Document offset at which the chunk starting at ``start`` is sliced."""
+        return max(start - self.chunk_overlap, 0)
+
+    def _combine_annotations(
+        self,
+        spans_list: Iterable[Sequence[EntitySpan]],
+        offsets: Sequence[int],
+    ) -> List[AnnotationResult]:
+        """
+        Combine per-chunk entity spans into results in document offsets.
+
+        A chunk only reports the spans starting in ``[offset, next offset)``. The
+        overlap on either side is context: a span starting in the leading overlap
+        may be cut off at the chunk's left edge and belongs to the previous chunk,
+        and one starting in the trailing overlap may be cut off at the right edge
+        and belongs to the next. Start positions are thus owned by exactly one
+        chunk, so no entity is reported twice. Spans are shifted to document
+        offsets as their results are built.
+        """
+        results = []
+        next_offsets = chain(offsets[1:], (None,))
+        # offsets first, so a lazy spans_list is never advanced past its last chunk
+        for offset, next_offset, spans in zip(offsets, next_offsets, spans_list):
+            origin = self._chunk_origin(offset)
+            for span in spans:
+                start = span.start + origin
+                if start >= offset and (next_offset is None or start < next_offset):
+                    results.append(span.to_annotation_result(origin))
+        return results
 
     def annotate_text_sync(self, text: str) -> List[AnnotationResult]:
         """Synchronously annotate a text string."""
         if not text:
             return []
-        #print(f"Starting on {text.split()[0]}")
-        chunks = self._chunk_text(text)
-        annotations_list = []
-        for chunk in chunks:
-            res = self.annotator.annotate(chunk)
-            annotations_list.append(res)
-        combined_annotations = self._combine_annotations(annotations_list)
-        #print(f"Done processing {text.split()[0]}")
-        return combined_annotations
-
-    def batch_annotate_text_sync(self, texts: List[str]) -> List[List[AnnotationResult]]:
+        if len(text) <= self.text_chunk_length + self.chunk_overlap:
+            return self.annotator.annotate(text)  # fits in one chunk
+        starts = self._chunk_starts(text)
+        spans_iter = self.annotator.iter_spans_batch(
+            self._iter_chunks(text, starts), batch_size=self.batch_size
+        )
+        return self._combine_annotations(spans_iter, starts)
+
+    def batch_annotate_text_sync(
+        self, texts: List[str]
+    ) -> List[List[AnnotationResult]]:
         """Synchronously annotate a list of text input."""
-        results = [self.annotate_text_sync(text) for text in texts]
-        return results
+        # Stream every text's chunks through one nlp.pipe call; chunk counts are
+        # known from the offsets alone, so the chunks themselves are never listed.
+        starts_list = [self._chunk_starts(text) for text in texts]
+        chunks = chain.from_iterable(
+            self._iter_chunks(text, starts) for text, starts in zip(texts, starts_list)
+        )
+        spans_iter = self.annotator.iter_spans_batch(
+            chunks,
+            batch_size=self.batch_size,
+            n_process=self._pipe_processes(sum(map(len, starts_list))),
+        )
+        # Each text takes its own chunks' spans off the shared stream
+        return [
+            self._combine_annotations(islice(spans_iter, len(starts)), starts)
+            for starts in starts_list
+        ]
+
+    def _pipe_processes(self, chunk_count: int) -> int:
+        """Number of spaCy worker processes to use for ``chunk_count`` chunks."""
+        max_procs = self.n_process
+        if max_procs is None:
+            max_procs = get_config().nlp_procs
+        if max_procs <= 0:
+            max_procs = os.cpu_count() or 1
+        if max_procs == 1 or chunk_count <= MULTIPROCESS_MIN_CHUNKS:
+            return 1
+        return max(1, min(max_procs, chunk_count // CHUNKS_PER_PROCESS))
 
-    async def annotate_text_async(self, text: str) -> Dict:
+    async def annotate_text_async(self, text: str) -> List[AnnotationResult]:
         """Asynchronously annotate a text string."""
         if not text:
-            return {}
+            return []
+        loop = asyncio.get_running_loop()
+        pool = _get_pool()
+        if len(text) <= self.text_chunk_length + self.chunk_overlap:
+            return await loop.run_in_executor(pool, self.annotator.annotate, text)
         chunks = self._chunk_text(text)
-        tasks = [asyncio.to_thread(self.annotator.annotate, chunk) for chunk in chunks]
-        annotations = await asyncio.gather(*tasks)
-        return self._combine_annotations(annotations)
-
-    async def batch_annotate_text_async(self, texts: List[str]) -> Dict[str, Dict]:
-        """Asynchronously annotate a list of text input."""
-        tasks = [self.annotate_text_async(txt) for txt in texts]
-        results = await asyncio.gather(*tasks)
-        return dict(zip(texts, results, strict=True))
+        tasks = [
+            loop.run_in_executor(pool, self.annotator.annotate_spans, chunk)
+            for _, chunk in chunks
+        ]
+        spans_list = await asyncio.gather(*tasks)
+        return self._combine_annotations(spans_list, [offset for offset, _ in chunks])
+
+    async def batch_annotate_text_async(
+        self,
+        texts: List[str],
+        on_result: Optional[Callable[[str, List[AnnotationResult]], None]] = None,
+    ) -> List[List[AnnotationResult]]:
+        """
+        Asynchronously annotate a list of text input.
+
+        Results are returned in input order, like ``batch_annotate_text_sync``. If
+        ``on_result`` is given it is called with ``(text, annotations)`` as each
+        text finishes, so consumers don't wait on the slowest document.
+        """
+        if on_result is None:
+            tasks = [self.annotate_text_async(txt) for txt in texts]
+            return list(await asyncio.gather(*tasks))
+
+        async def annotate_indexed(index: int):
+            return index, await self.annotate_text_async(texts[index])
+
+        results = [None] * len(texts)
+        tasks = [annotate_indexed(i) for i in range(len(texts))]
+        for next_done in asyncio.as_completed(tasks):
+            index, result = await next_done
+            results[index] = result
+            on_result(texts[index], result)
+        return results
@@ -39,7 +39,6 @@ setup(
         "fastapi",
         "asyncio",
         "setuptools",
-        "pydantic-settings==2.3.4",
         "typer==0.12.3",
         "sphinx",
         "cryptography",
@@ -1,3 +1,7 @@
+import hashlib
+import re
+from unittest.mock import patch
+
 import pytest
 
 from datafog.models.annotator import AnnotationResult, AnnotatorMetadata
@@ -6,6 +10,8 @@ from datafog.models.anonymizer import (
     Anonymizer,
     AnonymizerType,
     HashType,
+    _random_hex8,
+    _reset_random_pool,
 )
 from datafog.models.common import EntityTypes
 
@@ -124,3 +130,156 @@ def test_all_anonymizer_types(anonymizer_type, sample_text, sample_annotations):
     assert isinstance(result, AnonymizationResult)
     assert result.anonymized_text != sample_text
     assert len(result.replaced_entities) == 3
+
+
+def test_anonymizer_replace_skips_overlapping_annotations(sample_text):
+    annotations = [
+        AnnotationResult(
+            start=5,
+            end=10,
+            score=1.0,
+            entity_type=EntityTypes.PERSON,
+            recognition_metadata=AnnotatorMetadata(),
+        ),
+        AnnotationResult(
+            start=0,
+            end=10,
+            score=1.0,
+            entity_type=EntityTypes.PERSON,
+            recognition_metadata=AnnotatorMetadata(),
+        ),
+    ]
+    anonymizer = Anonymizer(anonymizer_type=AnonymizerType.REPLACE)
+    result = anonymizer.anonymize(sample_text, annotations)
+
+    assert len(result.replaced_entities) == 1
+    assert result.replaced_entities[0]["original"] == "Jeff Smith"
+    assert result.anonymized_text.endswith(" works at DigiCorp Incorporated in Paris.")
+
+
+def test_anonymizer_prefers_longer_annotation_with_same_start(sample_text):
+    annotations = [
+        AnnotationResult(
+            start=0,
+            end=7,
+            score=1.0,
+            entity_type=EntityTypes.PERSON,
+            recognition_metadata=AnnotatorMetadata(),
+        ),
+        AnnotationResult(
+            start=0,
+            end=10,
+            score=1.0,
+            entity_type=EntityTypes.PERSON,
+            recognition_metadata=AnnotatorMetadata(),
+        ),
+    ]
+    anonymizer = Anonymizer(anonymizer_type=AnonymizerType.REDACT)
+    result = anonymizer.anonymize(sample_text, annotations)
+
+    assert result.anonymized_text == (
+        "[REDACTED] works at DigiCorp Incorporated in Paris."
+    )
+
+
+MEETING_TEXT = "Jeff Smith met DigiCorp in Paris on 2024-01-02."
+
+
+def _annotate(text, *entities):
+    """Annotations for each ``(substring, entity_type)`` in ``entities``."""
+    return [
+        AnnotationResult(
+            start=text.index(substring),
+            end=text.index(substring) + len(substring),
+            score=1.0,
+            entity_type=entity_type,
+            recognition_metadata=AnnotatorMetadata(),
+        )
+        for substring, entity_type in entities
+    ]
+
+
+@pytest.fixture
+def meeting_annotations():
+    return _annotate(
+        MEETING_TEXT,
+        ("Jeff Smith", EntityTypes.PERSON),
+        ("DigiCorp", EntityTypes.ORG),
+        ("Paris", EntityTypes.GPE),
+        ("2024-01-02", EntityTypes.DATE),
+    )
+
+
+def test_redact_output(meeting_annotations):
+    anonymizer = Anonymizer(anonymizer_type=AnonymizerType.REDACT)
+    result = anonymizer.anonymize(MEETING_TEXT, meeting_annotations)
+
+    assert result.anonymized_text == (
+        "[REDACTED] met [REDACTED] in [REDACTED] on [REDACTED]."
+    )
+    assert anonymizer.redact_pii(MEETING_TEXT, meeting_annotations) == result
+    # Listed end to start
+    assert [r["original"] for r in result.replaced_entities] == [
+        "2024-01-02",
+        "Paris",
+        "DigiCorp",
+        "Jeff Smith",
+    ]
+
+
+def test_replace_output(meeting_annotations):
+    anonymizer = Anonymizer(anonymizer_type=AnonymizerType.REPLACE)
+    result = anonymizer.anonymize(MEETING_TEXT, meeting_annotations)
+
+    assert re.fullmatch(
+        r"\[PERSON_[0-9A-F]{8}\] met \[ORG_[0-9A-F]{8}\] "
+        r"in \[LOCATION_[0-9A-F]{8}\] on \[REDACTED_DATE\]\.",
+        result.anonymized_text,
+    )
+    again = anonymizer.replace_pii(MEETING_TEXT, meeting_annotations)
+    assert again.anonymized_text != result.anonymized_text  # fresh random tokens
+
+
+@pytest.mark.parametrize("hash_type", list(HashType))
+def test_hash_output(meeting_annotations, hash_type):
+    anonymizer = Anonymizer(anonymizer_type=AnonymizerType.HASH, hash_type=hash_type)
+    result = anonymizer.anonymize(MEETING_TEXT, meeting_annotations)
+
+    def digest(value):
+        return hashlib.new(hash_type.value, value.encode()).hexdigest()
+
+    assert result.anonymized_text == (
+        f"{digest('Jeff Smith')} met {digest('DigiCorp')} "
+        f"in {digest('Paris')} on {digest('2024-01-02')}."
+    )
+    assert anonymizer.hash_pii(MEETING_TEXT, meeting_annotations) == result
+
+
+def test_entities_filter_limits_replacements(meeting_annotations):
+    anonymizer = Anonymizer(
+        anonymizer_type=AnonymizerType.REDACT,
+        entities=[EntityTypes.GPE, EntityTypes.DATE],
+    )
+    result = anonymizer.anonymize(MEETING_TEXT, meeting_annotations)
+
+    assert result.anonymized_text == (
+        "Jeff Smith met DigiCorp in [REDACTED] on [REDACTED]."
+    )
+    assert [r["entity_type"] for r in result.replaced_entities] == [
+        EntityTypes.DATE,
+        EntityTypes.GPE,
+    ]
+
+
+def test_random_tokens_refill_buffer_when_used_up():
+    blocks = [bytes([0x01]) * 4096, bytes([0x02]) * 4096]
+    _reset_random_pool()
+    try:
+        with patch("os.urandom", side_effect=blocks) as mock_urandom:
+            # Four bytes per token, so 1024 tokens use up the first block
+            tokens = [_random_hex8() for _ in range(1025)]
+    finally:
+        _reset_random_pool()
+    assert mock_urandom.call_count == 2
+    assert set(tokens[:1024]) == {"01010101"}
+    assert tokens[1024] == "02020202"
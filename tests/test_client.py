@@ -1,8 +1,11 @@
+import subprocess
+import sys
 from unittest.mock import MagicMock, patch
 
 import pytest
 from typer.testing import CliRunner
 
+from datafog import client
 from datafog.client import app
 from datafog.models.annotator import AnnotationResult, AnnotatorMetadata
 from datafog.models.anonymizer import (
@@ -94,53 +97,56 @@ async def test_scan_text_success(mock_datafog):
     mock_instance.run_text_pipeline.assert_called_once_with(str_list=["Sample text"])
 
 
-def test_health():
-    result = runner.invoke(app, ["health"])
-    assert result.exit_code == 0
-    assert "DataFog is running" in result.stdout
+# Commands that only print are called directly; argument parsing is covered
+# by the CliRunner tests above and below.
+def test_health(capsys):
+    client.health()
+    assert "DataFog is running" in capsys.readouterr().out
 
 
 @patch("datafog.client.get_config")
-def test_show_config(mock_get_config):
+def test_show_config(mock_get_config, capsys):
     mock_get_config.return_value = {"key": "value"}
-    result = runner.invoke(app, ["show-config"])
-    assert result.exit_code == 0
-    assert "{'key': 'value'}" in result.stdout
+    client.show_config()
+    assert "{'key': 'value'}" in capsys.readouterr().out
+
+
+def test_cli_import_does_not_load_spacy():
+    # A fresh interpreter, since this one has spaCy loaded by other tests
+    code = "import sys, datafog.client; assert 'spacy' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True)
 
 
 @patch("datafog.client.SpacyAnnotator.download_model")
-def test_download_model(mock_download_model):
-    result = runner.invoke(app, ["download-model", "en_core_web_sm"])
-    assert result.exit_code == 0
-    assert "Model en_core_web_sm downloaded" in result.stdout
+def test_download_model(mock_download_model, capsys):
+    client.download_model(model_name="en_core_web_sm")
+    assert "Model en_core_web_sm downloaded" in capsys.readouterr().out
     mock_download_model.assert_called_once_with("en_core_web_sm")
 
 
 @patch("datafog.client.SpacyAnnotator")
-def test_show_spacy_model_directory(mock_spacy_annotator):
+def test_show_spacy_model_directory(mock_spacy_annotator, capsys):
     mock_instance = mock_spacy_annotator.return_value
     mock_instance.show_model_path.return_value = "/path/to/model"
-    result = runner.invoke(app, ["show-spacy-model-directory", "en_core_web_sm"])
-    assert result.exit_code == 0
-    assert "/path/to/model" in result.stdout
+    client.show_spacy_model_directory(model_name="en_core_web_sm")
+    assert "/path/to/model" in capsys.readouterr().out
+    mock_spacy_annotator.assert_called_once_with("en_core_web_sm")
 
 
 @patch("datafog.client.SpacyAnnotator")
-def test_list_spacy_models(mock_spacy_annotator):
+def test_list_spacy_models(mock_spacy_annotator, capsys):
     mock_instance = mock_spacy_annotator.return_value
     mock_instance.list_models.return_value = ["model1", "model2"]
-    result = runner.invoke(app, ["list-spacy-models"])
-    assert result.exit_code == 0
-    assert "['model1', 'model2']" in result.stdout
+    client.list_spacy_models()
+    assert "['model1', 'model2']" in capsys.readouterr().out
 
 
 @patch("datafog.client.SpacyAnnotator")
-def test_list_entities(mock_spacy_annotator):
+def test_list_entities(mock_spacy_annotator, capsys):
     mock_instance = mock_spacy_annotator.return_value
     mock_instance.list_entities.return_value = ["PERSON", "ORG"]
-    result = runner.invoke(app, ["list-entities"])
-    assert result.exit_code == 0
-    assert "['PERSON', 'ORG']" in result.stdout
+    client.list_entities()
+    assert "['PERSON', 'ORG']" in capsys.readouterr().out
 
 
 @patch("datafog.client.SpacyAnnotator")
@@ -0,0 +1,89 @@
+import dataclasses
+import sys
+from unittest.mock import Mock, patch
+
+import pytest
+
+from datafog import config
+from datafog.config import DataFogConfig, configure, configure_event_loop, get_config
+
+
+def test_defaults():
+    settings = DataFogConfig()
+    assert settings.annotator_base_url == "http://localhost:8000"
+    assert settings.request_timeout == 30
+    assert settings.rate_limit_per_minute is None
+    assert settings.nlp_procs == 1
+
+
+def test_values_from_environment(monkeypatch):
+    monkeypatch.setenv("DATAFOG_API_KEY", "secret")
+    monkeypatch.setenv("DATAFOG_NLP_PROCS", "3")
+    monkeypatch.setenv("DATAFOG_RETRY_BACKOFF_FACTOR", "1.5")
+    settings = DataFogConfig()
+    assert settings.api_key == "secret"
+    assert settings.nlp_procs == 3
+    assert settings.retry_backoff_factor == 1.5
+
+
+def test_config_is_immutable():
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        get_config().max_retries = 5
+
+
+def test_update_returns_copy():
+    settings = DataFogConfig()
+    updated = settings.update(max_retries=5)
+    assert updated.max_retries == 5
+    assert settings.max_retries == 3
+
+
+def test_update_rejects_unknown_key():
+    with pytest.raises(ValueError, match="Invalid configuration key: bogus"):
+        DataFogConfig().update(bogus=1)
+
+
+def test_values_from_lowercase_environment(monkeypatch):
+    monkeypatch.setenv("datafog_max_retries", "7")
+    assert DataFogConfig().max_retries == 7
+
+
+def test_update_leaves_global_config_alone(monkeypatch):
+    monkeypatch.setattr(config, "datafog_config", DataFogConfig())
+    held = get_config()
+    held.update(max_retries=5)
+    held.update(request_timeout=99)
+    assert get_config() is held
+    assert get_config().max_retries == 3
+    assert get_config().request_timeout == 30
+
+
+def test_configure_replaces_global_config(monkeypatch):
+    monkeypatch.setattr(config, "datafog_config", DataFogConfig())
+    configure(log_level="DEBUG")
+    assert get_config().log_level == "DEBUG"
+
+
+def test_configure_twice_keeps_both_changes(monkeypatch):
+    monkeypatch.setattr(config, "datafog_config", DataFogConfig())
+    configure(max_retries=5)
+    configure(request_timeout=99)
+    assert get_config().max_retries == 5
+    assert get_config().request_timeout == 99
+
+
+def test_configure_event_loop_without_uvloop():
+    with patch.dict(sys.modules, {"uvloop": None}), patch(
+        "asyncio.set_event_loop_policy"
+    ) as mock_set_policy:
+        assert configure_event_loop() is False
+    mock_set_policy.assert_not_called()
+
+
+def test_configure_event_loop_with_uvloop():
+    fake_uvloop = Mock()
+    with patch.dict(sys.modules, {"uvloop": fake_uvloop}), patch(
+        "asyncio.set_event_loop_policy"
+    ) as mock_set_policy:
+        assert configure_event_loop() is True
+    mock_set_policy.assert_called_once_with(fake_uvloop.EventLoopPolicy.return_value)
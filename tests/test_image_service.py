@@ -1,6 +1,7 @@
 # Pytest tests for image_service.py
 
 import asyncio
+from unittest.mock import AsyncMock, patch
 
 import pytest
 from PIL import Image
@@ -63,3 +64,48 @@ async def test_ocr_extract_with_donut():
 async def test_ocr_extract_no_processor_selected():
     with pytest.raises(ValueError, match="At least one OCR processor must be selected"):
         ImageService(use_tesseract=False, use_donut=False)
+
+
+@pytest.mark.asyncio
+async def test_ocr_extract_offline_keeps_order_and_isolates_errors(tmp_path):
+    wide, narrow = tmp_path / "wide.png", tmp_path / "narrow.png"
+    Image.new("RGB", (30, 10)).save(wide)
+    Image.new("RGB", (20, 10)).save(narrow)
+    broken = tmp_path / "broken.png"
+    broken.write_text("not an image")
+    paths = [str(wide), str(broken), str(narrow)]
+
+    image_service = ImageService()
+    image_service.tesseract_processor.extract_text_from_image = AsyncMock(
+        side_effect=lambda image: f"{image.width}px"
+    )
+    with patch("datafog.services.image_service._create_session") as create_session:
+        texts = await image_service.ocr_extract(paths)
+
+    assert texts[0] == "30px"
+    assert texts[1].startswith(f"Error processing image {broken}: ")
+    assert texts[2] == "20px"
+    create_session.assert_called_once_with()
+
+
+@pytest.mark.asyncio
+async def test_download_images_offline_shares_one_session():
+    image = Image.new("RGB", (1, 1))
+
+    async def download_image(url, session):
+        assert session is shared_session
+        if url == "https://example.com/missing.png":
+            raise Exception("Failed to download image. Status code: 404")
+        return image
+
+    image_service = ImageService()
+    image_service.downloader.download_image = download_image
+    with patch("datafog.services.image_service._create_session") as create_session:
+        shared_session = create_session.return_value.__aenter__.return_value
+        results = await image_service.download_images(
+            ["https://example.com/a.png", "https://example.com/missing.png"]
+        )
+
+    assert results[0] is image
+    assert isinstance(results[1], Exception)
+    create_session.assert_called_once_with()
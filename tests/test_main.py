@@ -8,6 +8,7 @@ import pytest
 
 from datafog.config import OperationType
 from datafog.main import DataFog
+from datafog.main import TextPIIAnnotator as MainTextPIIAnnotator
 from datafog.models.annotator import AnnotationResult
 from datafog.models.anonymizer import AnonymizerType, HashType
 from datafog.processing.text_processing.spacy_pii_annotator import (
@@ -106,14 +107,27 @@ def test_datafog_init():
     assert datafog_custom.operations == custom_operations
 
 
+def test_datafog_builds_default_services_lazily():
+    with patch("datafog.main.ImageService") as image_cls, patch(
+        "datafog.main.TextService"
+    ) as text_cls:
+        datafog = DataFog(operations=[])
+        assert datafog.run_text_pipeline_sync(["Sample text"]) == ["Sample text"]
+        image_cls.assert_not_called()
+        text_cls.assert_not_called()
+
+        assert datafog.text_service is datafog.text_service
+        text_cls.assert_called_once_with()
+
+
 @pytest.mark.asyncio
 async def test_run_ocr_pipeline(mock_image_service, mock_text_service):
     datafog = DataFog(image_service=mock_image_service, text_service=mock_text_service)
 
     mock_image_service.ocr_extract.return_value = ["Extracted text"]
-    mock_text_service.batch_annotate_text_async.return_value = {
-        "PERSON": ["Satya Nadella"]
-    }
+    mock_text_service.batch_annotate_text_async.return_value = [
+        {"PERSON": ["Satya Nadella"]}
+    ]
 
     result = await datafog.run_ocr_pipeline(["image_url"])
 
@@ -121,14 +135,16 @@ async def test_run_ocr_pipeline(mock_image_service, mock_text_service):
     mock_text_service.batch_annotate_text_async.assert_called_once_with(
         ["Extracted text"]
     )
-    assert result == {"PERSON": ["Satya Nadella"]}
+    assert result == [{"PERSON": ["Satya Nadella"]}]
 
 
 @pytest.mark.asyncio
 async def test_run_text_pipeline(mock_text_service):
     datafog = DataFog(text_service=mock_text_service)
 
-    mock_text_service.batch_annotate_text_async.return_value = {"PERSON": ["Elon Musk"]}
+    mock_text_service.batch_annotate_text_async.return_value = [
+        {"PERSON": ["Elon Musk"]}
+    ]
 
     result = await datafog.run_text_pipeline(
         ["Elon Musk tries one more time to save his $56 billion pay package"]
@@ -137,7 +153,7 @@ async def test_run_text_pipeline(mock_text_service):
     mock_text_service.batch_annotate_text_async.assert_called_once_with(
         ["Elon Musk tries one more time to save his $56 billion pay package"]
     )
-    assert result == {"PERSON": ["Elon Musk"]}
+    assert result == [{"PERSON": ["Elon Musk"]}]
 
 
 @pytest.mark.asyncio
@@ -239,3 +255,31 @@ def test_run_text_pipeline_anonymization(
             assert len(hashed_part) == 32
         elif hash_type in [HashType.SHA256, HashType.SHA3_256]:
             assert len(hashed_part) == 64
+
+
+def test_text_pii_annotator_run_writes_json(tmp_path):
+    annotations = [
+        AnnotationResult(
+            start=0,
+            end=9,
+            score=0.8,
+            entity_type="PERSON",
+            recognition_metadata=None,
+        )
+    ]
+    with patch("datafog.main.SpacyPIIAnnotator.create") as mock_create:
+        mock_create.return_value.annotate.return_value = annotations
+        annotator = MainTextPIIAnnotator()
+
+    output_path = tmp_path / "annotations.json"
+    assert annotator.run("Elon Musk", output_path=output_path) == annotations
+    with open(output_path) as f:
+        assert json.load(f) == [
+            {
+                "start": 0,
+                "end": 9,
+                "score": 0.8,
+                "entity_type": "PERSON",
+                "recognition_metadata": None,
+            }
+        ]
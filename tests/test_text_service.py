@@ -1,14 +1,46 @@
-from unittest.mock import Mock, patch
+from unittest.mock import Mock, call, patch
 
 import pytest
+import spacy
 
-from datafog.services.text_service import TextService
+from datafog.models.annotator import AnnotationResult, EntitySpan
+from datafog.models.anonymizer import Anonymizer, AnonymizerType
+from datafog.processing.text_processing.spacy_pii_annotator import (
+    RESULT_CACHE_MAX_TEXT_LENGTH,
+    SpacyPIIAnnotator,
+)
+from datafog.services.text_service import ChunkingStrategy, TextService, _get_pool
+
+# Both fall inside the 10-character chunks used by the text_service fixture
+JOHN = AnnotationResult(
+    start=0, end=4, score=0.8, entity_type="PERSON", recognition_metadata=None
+)
+ACME = AnnotationResult(
+    start=5, end=9, score=0.8, entity_type="ORG", recognition_metadata=None
+)
+
+
+JOHN_SPAN = EntitySpan(0, 4, "PERSON", 0.8)
+ACME_SPAN = EntitySpan(5, 9, "ORG", 0.8)
+
+
+def _shifted(offsets):
+    """What the mock annotator's [JOHN, ACME] become for chunks at ``offsets``."""
+    return [
+        a.model_copy(update={"start": a.start + o, "end": a.end + o})
+        for o in offsets
+        for a in (JOHN, ACME)
+    ]
 
 
 @pytest.fixture
 def mock_annotator():
     mock = Mock()
-    mock.annotate.return_value = {"PER": ["John Doe"], "ORG": ["Acme Inc"]}
+    mock.annotate.return_value = [JOHN, ACME]
+    mock.annotate_spans.return_value = (JOHN_SPAN, ACME_SPAN)
+    mock.iter_spans_batch.side_effect = lambda texts, **kwargs: (
+        mock.annotate_spans(text) for text in texts
+    )
     return mock
 
 
@@ -18,100 +50,285 @@ def text_service(mock_annotator):
         "datafog.services.text_service.SpacyPIIAnnotator.create",
         return_value=mock_annotator,
     ):
-        return TextService(text_chunk_length=10)
+        return TextService(text_chunk_length=10, chunk_overlap=0)
+
+
+@pytest.fixture
+def blank_service():
+    """Build TextServices on a blank spaCy pipeline, so only the regexes match."""
+
+    def build(**kwargs):
+        with patch(
+            "datafog.services.text_service.SpacyPIIAnnotator.create",
+            return_value=SpacyPIIAnnotator(nlp=spacy.blank("en")),
+        ):
+            return TextService(**kwargs)
+
+    return build
+
+
+def test_default_chunks_fit_result_cache(blank_service):
+    service = blank_service()
+    window = service.text_chunk_length + 2 * service.chunk_overlap
+    assert window <= RESULT_CACHE_MAX_TEXT_LENGTH
 
 
 def test_init(text_service):
     assert text_service.text_chunk_length == 10
+    assert text_service.batch_size == 64
+    assert text_service.chunk_overlap == 0
 
 
 def test_chunk_text(text_service):
     text = "This is a test sentence for chunking."
     chunks = text_service._chunk_text(text)
     assert len(chunks) == 4
-    assert chunks == ["This is a ", "test sente", "nce for ch", "unking."]
+    assert chunks == [
+        (0, "This is a "),
+        (10, "test sente"),
+        (20, "nce for ch"),
+        (30, "unking."),
+    ]
+
+
+def test_chunk_text_with_overlap(text_service):
+    text_service.chunk_overlap = 5
+    chunks = text_service._chunk_text("This is a test sentence for chunking.")
+    # Each chunk also reads the 5 characters before its start
+    assert chunks == [
+        (0, "This is a test "),
+        (10, "is a test sentence f"),
+        (20, "sentence for chunkin"),
+        (30, "or chunking."),
+    ]
+    # No trailing chunk that the previous chunk's overlap already covers
+    assert text_service._chunk_text("x" * 14) == [(0, "x" * 14)]
+
+
+def test_chunk_offsets(text_service):
+    assert list(text_service._chunk_offsets(37)) == [0, 10, 20, 30]
+    assert len(text_service._chunk_offsets(0)) == 0
+
+
+def test_chunk_text_by_sentence(text_service):
+    text_service.chunking = ChunkingStrategy.SENTENCE
+    text_service.text_chunk_length = 25
+    text = "Hi Jane. How are you? A sentence far too long to fit. Bye."
+    assert text_service._chunk_text(text) == [
+        (0, "Hi Jane. How are you? "),
+        (22, "A sentence far too long t"),
+        (47, "o fit. Bye."),
+    ]
+
+
+def test_annotator_options_are_passed_to_create(mock_annotator):
+    with patch(
+        "datafog.services.text_service.SpacyPIIAnnotator.create",
+        return_value=mock_annotator,
+    ) as mock_create:
+        TextService(required_pipes=["parser"], ner_prefilter=True)
+    mock_create.assert_called_once_with(required_pipes=["parser"], ner_prefilter=True)
+
+
+def test_chunking_strategy_is_validated(mock_annotator):
+    with patch(
+        "datafog.services.text_service.SpacyPIIAnnotator.create",
+        return_value=mock_annotator,
+    ):
+        assert TextService(chunking="sentence").chunking is ChunkingStrategy.SENTENCE
+        with pytest.raises(ValueError):
+            TextService(chunking="paragraph")
 
 
 def test_combine_annotations(text_service):
-    annotations = [
-        {"PER": ["John"], "ORG": ["Acme"]},
-        {"PER": ["Doe"], "LOC": ["New York"]},
+    spans = [[JOHN_SPAN], [ACME_SPAN, JOHN_SPAN]]
+    combined = text_service._combine_annotations(spans, [0, 10])
+    john_shifted, acme_shifted = _shifted([10])
+    assert combined == [JOHN, acme_shifted, john_shifted]
+
+
+def test_combine_annotations_leaves_overlap_tail_to_next_chunk(text_service):
+    # Chunk 0 sees the start of an entity in its overlap tail, cut off at its
+    # right edge; chunk 1 sees it whole.
+    cut_off = EntitySpan(12, 17, "ORG", 0.8)
+    whole = EntitySpan(2, 8, "ORG", 0.8)
+    combined = text_service._combine_annotations(
+        [[JOHN_SPAN, cut_off], [whole]], [0, 10]
+    )
+    assert combined == [JOHN, whole.to_annotation_result(10)]
+
+
+def test_combine_annotations_leaves_overlap_head_to_previous_chunk(text_service):
+    # With a 5-character overlap chunk 1 is sliced from 5; a span starting there
+    # is in chunk 0's range, cut off at chunk 1's left edge.
+    text_service.chunk_overlap = 5
+    cut_off = EntitySpan(0, 3, "ORG", 0.8)
+    owned = EntitySpan(5, 9, "ORG", 0.8)
+    combined = text_service._combine_annotations(
+        [[JOHN_SPAN], [cut_off, owned]], [0, 10]
+    )
+    assert combined == [JOHN, owned.to_annotation_result(5)]
+
+
+def test_entity_across_chunk_border_is_found(blank_service):
+    service = blank_service(text_chunk_length=20, chunk_overlap=15)
+    text = "Please call me at 555-123-4567 tomorrow"
+    result = service.annotate_text_sync(text)
+    assert [(r.entity_type, text[r.start : r.end]) for r in result] == [
+        ("PHONE_NUMBER", "555-123-4567")
     ]
-    combined = text_service._combine_annotations(annotations)
-    assert combined == {"PER": ["John", "Doe"], "ORG": ["Acme"], "LOC": ["New York"]}
 
 
-def test_annotate_text_sync(text_service):
+@pytest.mark.parametrize("chunking", ["fixed", "sentence"])
+def test_entity_across_overlap_edge_is_reported_once(blank_service, chunking):
+    service = blank_service(chunking=chunking)
+    # Crosses the first chunk's text_chunk_length + chunk_overlap edge at 1050
+    text = "x" * 1030 + " jane.doe@example.com done"
+    result = service.annotate_text_sync(text)
+    assert [(r.entity_type, r.start, r.end) for r in result] == [("EMAIL", 1031, 1051)]
+    redacted = Anonymizer(anonymizer_type=AnonymizerType.REDACT).anonymize(text, result)
+    assert redacted.anonymized_text == "x" * 1030 + " [REDACTED] done"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("chunking", ["fixed", "sentence"])
+@pytest.mark.parametrize("method", ["sync", "async"])
+async def test_entity_across_chunk_start_is_reported_once(
+    blank_service, chunking, method
+):
+    service = blank_service(chunking=chunking)
+    # Three chunks; the email crosses the second chunk's start at 1000
+    text = "x" * 995 + " jane.doe@example.com and more text here" + " filler" * 200
+    if method == "sync":
+        result = service.annotate_text_sync(text)
+    else:
+        result = await service.annotate_text_async(text)
+    assert [(r.entity_type, r.start, r.end) for r in result] == [("EMAIL", 996, 1016)]
+
+
+def test_annotate_text_sync(text_service, mock_annotator):
     result = text_service.annotate_text_sync("John Doe works at Acme Inc")
-    assert result == {
-        "PER": ["John Doe", "John Doe", "John Doe"],
-        "ORG": ["Acme Inc", "Acme Inc", "Acme Inc"],
-    }
+    assert result == _shifted([0, 10, 20])
+    mock_annotator.iter_spans_batch.assert_called_once()
+    assert mock_annotator.annotate_spans.call_args_list == [
+        call("John Doe w"),
+        call("orks at Ac"),
+        call("me Inc"),
+    ]
 
 
-def test_batch_annotate_text_sync(text_service):
+def test_batch_annotate_text_sync(text_service, mock_annotator):
     texts = ["John Doe", "Acme Inc"]
     result = text_service.batch_annotate_text_sync(texts)
-    assert result == {
-        "John Doe": {"PER": ["John Doe"], "ORG": ["Acme Inc"]},
-        "Acme Inc": {"PER": ["John Doe"], "ORG": ["Acme Inc"]},
+    assert result == [[JOHN, ACME], [JOHN, ACME]]
+    mock_annotator.iter_spans_batch.assert_called_once()
+    assert mock_annotator.iter_spans_batch.call_args.kwargs == {
+        "batch_size": 64,
+        "n_process": 1,
     }
+    assert mock_annotator.annotate_spans.call_args_list == [
+        call("John Doe"),
+        call("Acme Inc"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "nlp_procs, chunk_count, expected",
+    [(1, 10_000, 1), (4, 100, 1), (4, 160, 4), (4, 48_000, 4), (8, 128, 8)],
+)
+def test_pipe_processes(text_service, nlp_procs, chunk_count, expected):
+    with patch("datafog.services.text_service.get_config") as mock_get_config:
+        mock_get_config.return_value.nlp_procs = nlp_procs
+        assert text_service._pipe_processes(chunk_count) == expected
+
+
+def test_n_process_overrides_config(text_service):
+    text_service.n_process = -1
+    with patch("datafog.services.text_service.get_config") as mock_get_config, patch(
+        "datafog.services.text_service.os.cpu_count", return_value=2
+    ):
+        mock_get_config.return_value.nlp_procs = 1
+        assert text_service._pipe_processes(10_000) == 2
+
+
+def test_batch_annotate_text_sync_keeps_empty_texts(text_service):
+    result = text_service.batch_annotate_text_sync(["", "John Doe works at Acme"])
+    assert result == [[], _shifted([0, 10, 20])]
 
 
 @pytest.mark.asyncio
 async def test_annotate_text_async(text_service):
     result = await text_service.annotate_text_async("John Doe works at Acme Inc")
-    assert result == {
-        "PER": ["John Doe", "John Doe", "John Doe"],
-        "ORG": ["Acme Inc", "Acme Inc", "Acme Inc"],
-    }
+    assert result == _shifted([0, 10, 20])
 
 
 @pytest.mark.asyncio
 async def test_batch_annotate_text_async(text_service):
     texts = ["John Doe", "Acme Inc"]
     result = await text_service.batch_annotate_text_async(texts)
-    assert result == {
-        "John Doe": {"PER": ["John Doe"], "ORG": ["Acme Inc"]},
-        "Acme Inc": {"PER": ["John Doe"], "ORG": ["Acme Inc"]},
-    }
+    assert result == [[JOHN, ACME], [JOHN, ACME]]
+
+
+@pytest.mark.asyncio
+async def test_batch_annotate_text_async_keeps_duplicate_texts(text_service):
+    result = await text_service.batch_annotate_text_async(["John Doe", "John Doe", ""])
+    assert result == [[JOHN, ACME], [JOHN, ACME], []]
+
+
+@pytest.mark.asyncio
+async def test_batch_annotate_text_async_streams_results(text_service):
+    texts = ["John Doe", "Acme Inc"]
+    streamed = []
+    result = await text_service.batch_annotate_text_async(
+        texts, on_result=lambda text, annotations: streamed.append(text)
+    )
+    assert sorted(streamed) == sorted(texts)
+    assert result == await text_service.batch_annotate_text_async(texts)
+
+
+def test_get_pool_returns_shared_pool():
+    pool = _get_pool()
+    with patch("datafog.services.text_service.ThreadPoolExecutor") as executor:
+        assert _get_pool() is pool
+    executor.assert_not_called()
 
 
 def test_long_text_chunking(text_service):
     long_text = "John Doe works at Acme Inc. Jane Smith is from New York City."
     result = text_service.annotate_text_sync(long_text)
-    expected_count = len(text_service._chunk_text(long_text))
-    assert result == {
-        "PER": ["John Doe"] * expected_count,
-        "ORG": ["Acme Inc"] * expected_count,
-    }
+    offsets = [offset for offset, _ in text_service._chunk_text(long_text)]
+    assert result == _shifted(offsets)
 
 
 @pytest.mark.asyncio
 async def test_long_text_chunking_async(text_service):
     long_text = "John Doe works at Acme Inc. Jane Smith is from New York City."
     result = await text_service.annotate_text_async(long_text)
-    expected_count = len(text_service._chunk_text(long_text))
-    assert result == {
-        "PER": ["John Doe"] * expected_count,
-        "ORG": ["Acme Inc"] * expected_count,
-    }
+    offsets = [offset for offset, _ in text_service._chunk_text(long_text)]
+    assert result == _shifted(offsets)
 
 
 def test_empty_string(text_service):
     result = text_service.annotate_text_sync("")
-    assert result == {}
+    assert result == []
 
 
-def test_short_string(text_service):
+def test_short_string(text_service, mock_annotator):
     result = text_service.annotate_text_sync("Short")
-    assert result == {"PER": ["John Doe"], "ORG": ["Acme Inc"]}
+    assert result == [JOHN, ACME]
+    mock_annotator.annotate.assert_called_once_with("Short")
+    mock_annotator.iter_spans_batch.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_short_string_async(text_service, mock_annotator):
+    result = await text_service.annotate_text_async("Short")
+    assert result == [JOHN, ACME]
+    mock_annotator.annotate.assert_called_once_with("Short")
 
 
 def test_special_characters(text_service):
-    result = text_service.annotate_text_sync("John@Doe.com works at Acme-Inc!!!")
-    expected_count = len(text_service._chunk_text("John@Doe.com works at Acme-Inc!!!"))
-    assert result == {
-        "PER": ["John Doe"] * expected_count,
-        "ORG": ["Acme Inc"] * expected_count,
-    }
+    text = "John@Doe.com works at Acme-Inc!!!"
+    result = text_service.annotate_text_sync(text)
+    offsets = [offset for offset, _ in text_service._chunk_text(text)]
+    assert result == _shifted(offsets)